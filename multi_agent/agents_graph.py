@@ -1,5 +1,6 @@
 from .retrieval import retrieval
 from .agents import document_grader_agent, search_agent, qa_agent, query_rewriter_agent, emotion, llm
+from .faq_index import lookup_faq, VECTOR_STORE_PATH
 from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate
 from typing import List, TypedDict, Literal, Dict
@@ -18,6 +19,7 @@ class GraphState(TypedDict):
         generation: LLM response generation
         web_search_needed: flag of whether to add web search - yes or no
         documents: list of context documents
+        faq_hit: flag of whether the answer was served from the FAQ index
     """
 
     question: str
@@ -26,6 +28,7 @@ class GraphState(TypedDict):
     documents: List[Document]
     emotion: Literal["happy", "sad", "angry", "neutral"]
     history: List[Dict[str, str]]
+    faq_hit: bool
 
 memory = ConversationBufferMemory()
 
@@ -42,9 +45,8 @@ def retrieve(state):
     # print("---RETRIEVAL FROM VECTOR DB---")
     question = state["question"]
 
-    # Get absolute path to vector store
-    current_dir = Path(__file__).parent
-    vector_store_path = current_dir / "RAG_MultiAgent_Ayurveda"
+    # Shared with the FAQ index so its fingerprint always describes this store
+    vector_store_path = VECTOR_STORE_PATH
     
     # Ensure vector store directory exists
     if not vector_store_path.exists():
@@ -68,6 +70,57 @@ def retrieve(state):
         # Return empty documents list instead of failing
         return {"documents": [], "question": question}
 
+def faq_lookup(state):
+    """
+    Serve a precomputed answer when the question matches a canonical FAQ question
+
+    Args:
+        state (dict): The current graph state
+    Returns:
+        state (dict): Sets faq_hit, plus generation and history on a match
+    """
+    try:
+        match = lookup_faq(state["question"])
+    except Exception as e:
+        print(f"Error during FAQ lookup: {e}")
+        match = None
+    if match is None:
+        return {**state, "faq_hit": False}
+
+    print(
+        f"FAQ hit: '{state['question']}' matched '{match['question']}' "
+        f"(score {match['score']:.3f}, sources {match['sources']})"
+    )
+
+    memory.save_context(
+        {"input": state["question"]},
+        {"output": match["answer"]}
+    )
+
+    return {
+        **state,
+        "faq_hit": True,
+        "generation": match["answer"],
+        "history": state["history"] + [
+            {"user": state["question"], "bot": match["answer"]}
+        ]
+    }
+
+def decide_faq_hit(state):
+    """
+    Determines whether the FAQ index answered the question or the full graph must run.
+
+    Args:
+        state (dict): The current graph state
+
+    Returns:
+        str: Binary decision for next node to call
+    """
+    if state.get("faq_hit"):
+        return "answered"
+    else:
+        return "detect_emotion"
+
 def detect_emotion(state):
     emotion_chain = emotion()
     emotion_det = emotion_chain.invoke({"input": state["question"]}).strip().lower()
@@ -200,10 +253,8 @@ b. anything related to Ayurvedic medicines and surgery. Consider the user's emot
 """)
 
 
-# Modified Generate Answer Node
-def generate_answer(state: GraphState):
-    """Node: Generate emotion-aware response"""
-    # print("---GENERATING EMOTION-AWARE RESPONSE---")
+def compose_response(state: GraphState) -> str:
+    """Build the emotion-aware prompt from the state and return the LLM response"""
     history_str = format_history(state["history"])
     
     # Build prompt with emotion context
@@ -215,7 +266,13 @@ def generate_answer(state: GraphState):
     )
     
     # Generate response
-    response = llm.invoke(prompt).content
+    return llm.invoke(prompt).content
+
+# Modified Generate Answer Node
+def generate_answer(state: GraphState):
+    """Node: Generate emotion-aware response"""
+    # print("---GENERATING EMOTION-AWARE RESPONSE---")
+    response = compose_response(state)
     
     # Update memory
     memory.save_context(
@@ -231,6 +288,10 @@ def generate_answer(state: GraphState):
         ]
     }
 
+def generate_faq_answer(state: GraphState):
+    """Node: Generate a neutral response for the offline FAQ index, leaving the shared memory untouched"""
+    response = compose_response({**state, "emotion": "neutral", "history": []})
+    return {**state, "emotion": "neutral", "generation": response}
 
 def decide_to_generate(state):
     """
@@ -260,6 +321,7 @@ def decide_to_generate(state):
 agentic_rag = StateGraph(GraphState)
 
 # Define the nodes
+agentic_rag.add_node("faq_lookup", faq_lookup)
 agentic_rag.add_node("detect_emotion", detect_emotion)
 agentic_rag.add_node("retrieve", retrieve)
 agentic_rag.add_node("grade_documents", grade_documents)  # Your existing grading function
@@ -267,7 +329,15 @@ agentic_rag.add_node("generate_answer", generate_answer)
 agentic_rag.add_node("web_search", web_search)  # Your existing web search
 
 # Define workflow
-agentic_rag.set_entry_point("detect_emotion")
+agentic_rag.set_entry_point("faq_lookup")
+agentic_rag.add_conditional_edges(
+    "faq_lookup",
+    decide_faq_hit,
+    {
+        "answered": END,
+        "detect_emotion": "detect_emotion"
+    }
+)
 agentic_rag.add_edge("detect_emotion", "retrieve")
 agentic_rag.add_edge("retrieve", "grade_documents")
 agentic_rag.add_conditional_edges(
@@ -284,6 +354,28 @@ agentic_rag.add_edge("generate_answer", END)
 # Compile
 agentic_rag = agentic_rag.compile()
 
+# Offline graph used to build the FAQ index: no FAQ lookup, no emotion detection,
+# no web search and no writes to the shared memory
+faq_build_rag = StateGraph(GraphState)
+
+faq_build_rag.add_node("retrieve", retrieve)
+faq_build_rag.add_node("grade_documents", grade_documents)
+faq_build_rag.add_node("generate_answer", generate_faq_answer)
+
+faq_build_rag.set_entry_point("retrieve")
+faq_build_rag.add_edge("retrieve", "grade_documents")
+faq_build_rag.add_conditional_edges(
+    "grade_documents",
+    decide_to_generate,
+    {
+        "rewrite_query": END,
+        "generate_answer": "generate_answer"
+    }
+)
+faq_build_rag.add_edge("generate_answer", END)
+
+faq_build_rag = faq_build_rag.compile()
+
 def run_agentic_rag() -> str:
     """
     Run the agentic RAG graph
@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import hashlib
+import tempfile
+import re
+from pathlib import Path
+import numpy as np
+from .agents import embeddings
+import warnings
+warnings.filterwarnings("ignore")
+
+current_dir = Path(__file__).parent
+VECTOR_STORE_PATH = current_dir / "RAG_MultiAgent_Ayurveda"
+FAQ_INDEX_PATH = current_dir / "faq_index.npz"
+
+# Minimum cosine similarity between a user question and a canonical question
+# for the precomputed answer to be served instead of running the graph.
+# The paraphrase model scores contrasting legal questions ("terminate with notice" /
+# "terminate without notice") close to 0.9, so this must sit above the best score of
+# the contrasting variants of the canonical list. Recalibrate after changing the
+# questions or the embedding model with:
+#   python -m multi_agent.faq_index --calibrate contrasts.tsv
+# where each line is "<canonical question>\t<negated or contrasting variant>", and set
+# the threshold above the reported maximum.
+FAQ_SIMILARITY_THRESHOLD = 0.95
+
+# Minimum gap between the best and second-best canonical question. A question that
+# sits between two canonical questions is left to the full graph.
+FAQ_MIN_MARGIN = 0.03
+
+# Words that flip the meaning of a question without moving its embedding much
+NEGATION_WORDS = {"not", "no", "never", "without", "cannot", "nor", "neither", "none"}
+NEGATION_PREFIXES = ("un", "non", "in", "dis")
+
+_faq_cache = {"index_stamp": None, "index": None, "stale_warned": None}
+_file_digest_cache = {}
+
+
+def _file_digest(file_path, stat):
+    """
+    Return the sha256 of a file's contents, rehashing only when its name, size or
+    modification time changes.
+    """
+    key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_digest_cache:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        _file_digest_cache[key] = digest.hexdigest()
+    return _file_digest_cache[key]
+
+
+def vectorstore_fingerprint():
+    """
+    Fingerprint the vector store written by `vectorstore_save` and read by `retrieve`.
+
+    The fingerprint hashes file names and contents, so copies of the same store
+    (fresh clones, Docker images, Lambda bundles) share it. Content digests are cached
+    per file stat, so a request only pays for a `stat` of each file.
+    """
+    if not VECTOR_STORE_PATH.exists():
+        return None
+    digest = hashlib.sha256()
+    for file_path in sorted(VECTOR_STORE_PATH.iterdir()):
+        if not file_path.is_file():
+            continue
+        file_digest = _file_digest(file_path, file_path.stat())
+        digest.update(f"{file_path.name}:{file_digest}".encode())
+    return digest.hexdigest()
+
+
+def _embed(texts):
+    """
+    Embed texts and L2-normalise them so a dot product is the cosine similarity.
+    """
+    vectors = np.asarray(embeddings.embed_documents(list(texts)), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _document_sources(documents):
+    """
+    Collect the unique (source, page) pairs of the documents an answer was built from.
+    """
+    sources = []
+    for doc in documents:
+        source = {"source": doc.metadata.get("source"), "page": doc.metadata.get("page")}
+        if source["source"] is not None and source not in sources:
+            sources.append(source)
+    return sources
+
+
+def build_faq_index(questions, index_path=FAQ_INDEX_PATH):
+    """
+    Run canonical questions through `faq_build_rag` and save the answers, sources and
+    question embeddings to a compressed index stamped with the vector store fingerprint.
+
+    The build graph skips the FAQ lookup, so existing entries are never copied
+    forward, and answers are written in a neutral tone without touching the chat memory.
+    Questions whose documents were not relevant enough (which would trigger a web search
+    at serving time) or that have no corpus sources are skipped, since their answers do
+    not depend only on the indexed corpus and could not be invalidated along with it.
+    """
+    # Imported here because agents_graph imports this module for the lookup node
+    from .agents_graph import faq_build_rag
+
+    # The store must not change while answers are generated, or the index would carry
+    # the new store's fingerprint on answers built from the old one
+    fingerprint = vectorstore_fingerprint()
+    if fingerprint is None:
+        raise FileNotFoundError(f"Vectorstore not found at path: {VECTOR_STORE_PATH}")
+
+    entries = []
+    for question in questions:
+        question = question.strip()
+        if not question:
+            continue
+        state = {
+            "question": question,
+            "generation": "",
+            "web_search_needed": "no",
+            "documents": [],
+            "emotion": "neutral",
+            "history": []
+        }
+        try:
+            result = faq_build_rag.invoke(state)
+        except Exception as e:
+            print(f"Error answering '{question}': {e}")
+            continue
+        if result.get("web_search_needed") == "Yes":
+            print(f"Skipping '{question}': answer is not grounded in the vector store")
+            continue
+        sources = _document_sources(result["documents"])
+        if not result["generation"] or not sources:
+            print(f"Skipping '{question}': answer has no sources in the vector store")
+            continue
+        entries.append((question, result["generation"], sources))
+
+    if not entries:
+        raise ValueError("No canonical questions could be answered from the vector store")
+
+    if vectorstore_fingerprint() != fingerprint:
+        raise RuntimeError("Vector store changed while the FAQ index was being built; rerun the build")
+
+    faq_questions = [question for question, _, _ in entries]
+    # Write next to the live index and swap it in, so the API never loads a partial file
+    fd, tmp_path = tempfile.mkstemp(suffix=".npz", dir=os.path.dirname(os.path.abspath(index_path)))
+    os.close(fd)
+    try:
+        np.savez_compressed(
+            tmp_path,
+            embeddings=_embed(faq_questions),
+            questions=np.array(faq_questions),
+            answers=np.array([answer for _, answer, _ in entries]),
+            sources=np.array([json.dumps(sources) for _, _, sources in entries]),
+            fingerprint=np.array(fingerprint),
+        )
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(entries)
+
+
+def load_faq_index(index_path=FAQ_INDEX_PATH):
+    """
+    Load the FAQ index, reusing the cached copy until the index file is rewritten.
+    """
+    if not os.path.exists(index_path):
+        return None
+    stat = os.stat(index_path)
+    index_stamp = (stat.st_size, stat.st_mtime_ns)
+    if _faq_cache["index_stamp"] != index_stamp:
+        with np.load(index_path, allow_pickle=False) as data:
+            _faq_cache["index"] = {key: data[key] for key in data.files}
+        _faq_cache["index_stamp"] = index_stamp
+    return _faq_cache["index"]
+
+
+def lookup_faq(question, index_path=FAQ_INDEX_PATH, threshold=FAQ_SIMILARITY_THRESHOLD):
+    """
+    Return the precomputed answer for a question matching a canonical question.
+
+    Returns None when there is no index, when the vector store has changed since the
+    index was built, when no canonical question is similar enough, when the best match
+    is not clearly ahead of the runner-up, or when the two questions differ by a negation.
+    """
+    index = load_faq_index(index_path)
+    if index is None:
+        return None
+    if str(index["fingerprint"]) != vectorstore_fingerprint():
+        if _faq_cache["stale_warned"] != _faq_cache["index_stamp"]:
+            print(f"FAQ index at {index_path} is stale: the vector store has changed since it was built")
+            _faq_cache["stale_warned"] = _faq_cache["index_stamp"]
+        return None
+
+    scores = index["embeddings"] @ _embed([question])[0]
+    ranked = np.argsort(scores)[::-1]
+    best = int(ranked[0])
+    if scores[best] < threshold:
+        return None
+    if len(ranked) > 1 and scores[best] - scores[ranked[1]] < FAQ_MIN_MARGIN:
+        return None
+    canonical = str(index["questions"][best])
+    if is_contrasting(question, canonical):
+        return None
+    return {
+        "question": canonical,
+        "answer": str(index["answers"][best]),
+        "sources": json.loads(str(index["sources"][best])),
+        "score": float(scores[best]),
+    }
+
+
+def is_contrasting(question, canonical):
+    """
+    Check whether two similar questions differ by a negation, e.g. "with notice" /
+    "without notice" or "capped" / "uncapped".
+    """
+    words = set(re.findall(r"[a-z']+", question.lower()))
+    canonical_words = set(re.findall(r"[a-z']+", canonical.lower()))
+    for word in words ^ canonical_words:
+        if word in NEGATION_WORDS or word.endswith("n't"):
+            return True
+        other_words = canonical_words if word in words else words
+        for prefix in NEGATION_PREFIXES:
+            if word.startswith(prefix) and word[len(prefix):] in other_words:
+                return True
+    return False
+
+
+def calibrate_threshold(contrast_pairs):
+    """
+    Score each (canonical question, contrasting variant) pair with the embedding model.
+
+    Returns the pairs with their cosine similarity, highest first. The FAQ threshold
+    must sit above the first score, or that variant would be served the canonical answer
+    whenever the negation check misses it.
+    """
+    canonicals = _embed([canonical for canonical, _ in contrast_pairs])
+    variants = _embed([variant for _, variant in contrast_pairs])
+    scores = np.sum(canonicals * variants, axis=1)
+    return sorted(
+        ((canonical, variant, float(score)) for (canonical, variant), score in zip(contrast_pairs, scores)),
+        key=lambda pair: pair[2],
+        reverse=True,
+    )
+
+if __name__ == "__main__":
+    # Usage: python -m multi_agent.faq_index questions.txt  (one canonical question per line)
+    #        python -m multi_agent.faq_index --calibrate contrasts.tsv
+    if len(sys.argv) == 3 and sys.argv[1] == "--calibrate":
+        with open(sys.argv[2], encoding="utf-8") as f:
+            pairs = [tuple(line.rstrip("\n").split("\t", 1)) for line in f if "\t" in line]
+        if not pairs:
+            print("No tab-separated question pairs found")
+            sys.exit(1)
+        scored_pairs = calibrate_threshold(pairs)
+        for canonical, variant, score in scored_pairs:
+            print(f"{score:.3f}  {canonical}  |  {variant}")
+        max_score = scored_pairs[0][2]
+        print(f"Highest contrasting score: {max_score:.3f} (FAQ_SIMILARITY_THRESHOLD = {FAQ_SIMILARITY_THRESHOLD})")
+        if max_score >= FAQ_SIMILARITY_THRESHOLD:
+            print("Warning: raise FAQ_SIMILARITY_THRESHOLD above the highest contrasting score")
+        sys.exit(0)
+    if len(sys.argv) != 2:
+        print("Usage: python -m multi_agent.faq_index <questions_file>")
+        print("       python -m multi_agent.faq_index --calibrate <contrasts_tsv>")
+        sys.exit(1)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        canonical_questions = f.readlines()
+    count = build_faq_index(canonical_questions)
+    print(f"Saved {count} answers to {FAQ_INDEX_PATH}")